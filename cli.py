@@ -11,9 +11,12 @@
 import argparse
 from tqdm import tqdm
 
+from core import canon
 from core.builder import build_epub
+from core.lowmem import peak_rss_mb
+from core.optimize import format_size_report, size_report
 from core.validate import validate_epub
-from core.config import DEFAULT_OUTPUT, BOOKS_DATA, OLD_TESTAMENT_BOOKS, NEW_TESTAMENT_BOOKS
+from core.config import DEFAULT_OUTPUT
 
 
 def create_cli_progress_handler():
@@ -68,17 +71,37 @@ def main():
     parser.add_argument(
         "--no-resume",
         action="store_true",
-        help="Do not use resume behavior (still uses cache, but semantics flag)"
+        help="Ignore the build journal of an interrupted run and start over (cache is still used)"
     )
     parser.add_argument(
         "--validate",
         action="store_true",
         help="Run epubcheck after building"
     )
+    parser.add_argument(
+        "--optimize-size",
+        action="store_true",
+        help="Build a smaller EPUB (recompressed cover, minified CSS/XHTML, "
+             "maximum zip compression) and report the size of each component"
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="Keep memory bounded: read chapters from the cache while rendering "
+             "and hold rendered books on disk until they are zipped "
+             "(the cover is not recompressed)"
+    )
+    parser.add_argument(
+        "--memory-ceiling",
+        type=float,
+        metavar="MB",
+        help="Exit with an error if peak memory use exceeds this many MB (for CI)"
+    )
     parser.add_argument(
         "--books",
         type=str,
-        help="Comma-separated list of books to include (e.g., 'Genesis,Exodus,John')."
+        help="Comma-separated books, abbreviations, book ranges or chapter ranges "
+             "to include (e.g., 'Genesis,Exodus,John' or 'Gen-Deut,Matt 5-7')."
     )
     parser.add_argument(
         "--only-ot",
@@ -97,30 +120,25 @@ def main():
 
     # --- Determine which books to build ---
     books_to_build = None  # Default to all books
+    chapter_selection = None
     if args.only_ot:
         print("Selecting Old Testament books...")
-        books_to_build = [book for book in BOOKS_DATA if book[0] in OLD_TESTAMENT_BOOKS]
+        books_to_build = canon.testament_books(new_testament=False)
     elif args.only_nt:
         print("Selecting New Testament books...")
-        books_to_build = [book for book in BOOKS_DATA if book[0] in NEW_TESTAMENT_BOOKS]
+        books_to_build = canon.testament_books(new_testament=True)
     elif args.books:
         print(f"Selecting custom books: {args.books}")
-        books_to_build = []
-        all_book_map = {book[0].lower(): book for book in BOOKS_DATA}
-        requested_books = [b.strip().lower() for b in args.books.split(',')]
-
-        for req_book in requested_books:
-            if req_book in all_book_map:
-                books_to_build.append(all_book_map[req_book])
-            else:
-                print(f"Warning: Book '{req_book}' not found and will be skipped.")
+        books_to_build, chapter_selection, unknown = canon.parse_selection(args.books)
+        for term in unknown:
+            print(f"Warning: '{term}' is not a known book or chapter range and will be skipped.")
     if books_to_build is not None and not books_to_build:
         print("Error: No valid books selected. Aborting.")
         return
 
     progress_handler = create_cli_progress_handler()
 
-    build_epub(
+    notes = build_epub(
         output_path=args.output,
         skip_cache=args.skip_cache,
         retries=3,
@@ -129,8 +147,29 @@ def main():
         resume=resume,
         progress_callback=progress_handler,
         books_to_build=books_to_build,
+        chapter_selection=chapter_selection,
+        optimize_size=args.optimize_size,
+        low_memory=args.low_memory,
     )
 
+    for note in notes:
+        print(note)
+
+    if args.optimize_size:
+        print()
+        for line in format_size_report(size_report(args.output)):
+            print(line)
+
+    if args.memory_ceiling is not None:
+        peak = peak_rss_mb()
+        if peak is None:
+            print("Warning: peak memory is not available on this platform; ceiling not checked.")
+        else:
+            print(f"\nPeak memory: {peak:.1f} MB (ceiling {args.memory_ceiling:.1f} MB)")
+            if peak > args.memory_ceiling:
+                print("Error: peak memory exceeded the ceiling.")
+                raise SystemExit(1)
+
     if args.validate:
         print("Validating EPUB...")
         validate_epub(args.output)
@@ -8,10 +8,18 @@
 # (at your option) any later version.
 # ---------------------------------------------------------------------------
 
+import tempfile
+from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
 from ebooklib import epub
+from . import canon
 from .config import BOOKS_DATA, DEFAULT_OUTPUT
 from .fetcher import fetch_all_chapters
+from .journal import BuildJournal
+from .lowmem import SpooledEpubHtml
+from .optimize import ZIP_COMPRESSLEVEL, minify_css, minify_xhtml, optimize_image
+from .utils import log_error, read_cached_chapter
 
 # --- Path to asset files ---
 SCRIPT_DIR = Path(__file__).parent
@@ -19,10 +27,11 @@ ASSETS_DIR = SCRIPT_DIR.parent / "assets"
 COPYRIGHT_FILE = ASSETS_DIR / "copyright.html"
 STYLE_FILE = ASSETS_DIR / "style.css"
 
-def make_filename(book: str) -> str:
-    # Example: "1 John" -> "1_john.xhtml"
-    safe = book.replace(" ", "_").lower()
-    return f"{safe}.xhtml"
+@lru_cache(maxsize=None)
+def chapter_grid(chapters: tuple[int, ...] | range) -> str:
+    # Most books share a handful of chapter counts, so build each grid once
+    links = "".join(f'<a class="grid-link" href="#ch{c}">{c}</a>' for c in chapters)
+    return f'<div class="chapter-grid">{links}</div>'
 
 def build_epub(output_path: str | Path = DEFAULT_OUTPUT,
                skip_cache: bool = False,
@@ -31,10 +40,15 @@ def build_epub(output_path: str | Path = DEFAULT_OUTPUT,
                max_rps: float = 2.0,
                resume: bool = True,
                cover_path: str | None = "cover.png",
-               progress_callback: callable | None = None,
-               books_to_build: list[tuple[str, int]] | None = None):
+               progress_callback: Callable | None = None,
+               books_to_build: list[tuple[str, int]] | None = None,
+               chapter_selection: dict[str, list[int]] | None = None,
+               optimize_size: bool = False,
+               low_memory: bool = False):
 
     output_path = Path(output_path)
+    # Human-readable remarks about the build, returned to the caller
+    notes = []
 
     # --- Externalized Content ---
     if not COPYRIGHT_FILE.exists() or not STYLE_FILE.exists():
@@ -45,20 +59,49 @@ def build_epub(output_path: str | Path = DEFAULT_OUTPUT,
     copyright_html = COPYRIGHT_FILE.read_text(encoding="utf-8")
     style = STYLE_FILE.read_text(encoding="utf-8")
 
+    # Size-optimized profile: minified text, recompressed cover, tighter zip
+    write_options = {}
+    if optimize_size:
+        style = minify_css(style)
+        copyright_html = minify_xhtml(copyright_html)
+        write_options["compresslevel"] = ZIP_COMPRESSLEVEL
+
+    # Low-memory mode: chapters are read from the cache as each book is
+    # rendered, and rendered books wait on disk until they are zipped
+    book_class = epub.EpubHtml
+    spool_dir = None
+    if low_memory:
+        book_class = SpooledEpubHtml
+        spool_dir = tempfile.TemporaryDirectory(prefix="net-bible-")
+
     # If no specific books are provided, default to all books from config
     if books_to_build is None:
         books_to_build = BOOKS_DATA
 
-    # 1. Fetch all chapters
-    fetch_results = fetch_all_chapters(
-        skip_cache=skip_cache,
-        retries=retries,
-        max_workers=max_workers,
-        max_rps=max_rps,
-        resume=resume,
-        progress_callback=progress_callback,
-        books_to_fetch=books_to_build
-    )
+    # Pick up where an interrupted build of the same selection stopped.
+    # A forced refresh must refetch and re-render everything, so it
+    # always starts a fresh journal.
+    journal = BuildJournal.load(books_to_build, chapter_selection,
+                                resume=resume and not skip_cache,
+                                optimize_size=optimize_size)
+
+    # 1. Fetch all chapters (only those the journal hasn't seen succeed)
+    fetch_results = {}
+    if not journal.stage_done("fetch"):
+        fetch_results = fetch_all_chapters(
+            skip_cache=skip_cache,
+            retries=retries,
+            max_workers=max_workers,
+            max_rps=max_rps,
+            resume=resume,
+            progress_callback=progress_callback,
+            books_to_fetch=books_to_build,
+            chapter_selection=chapter_selection,
+            journal=journal,
+            keep_text=not low_memory
+        )
+        if not journal.failed_chapters():
+            journal.mark_stage("fetch")
 
     # 2. Build EPUB
     book = epub.EpubBook()
@@ -70,12 +113,20 @@ def build_epub(output_path: str | Path = DEFAULT_OUTPUT,
     # Cover Logic
     if cover_path and Path(cover_path).exists():
         ext = Path(cover_path).suffix.lower()
-        book.set_cover(f"cover{ext}", Path(cover_path).read_bytes())
-
-    # Copyright Page
-    c_copyright = epub.EpubHtml(title='Copyright', file_name='copyright.xhtml', lang='en')
-    c_copyright.content = copyright_html
-    book.add_item(c_copyright)
+        cover_data = Path(cover_path).read_bytes()
+        if optimize_size and low_memory:
+            # Decoding the cover costs more memory than any single book
+            notes.append("Cover left unchanged: recompression is skipped with --low-memory")
+        elif optimize_size:
+            original_size = len(cover_data)
+            cover_data = optimize_image(cover_data, ext)
+            if len(cover_data) < original_size:
+                notes.append(f"Cover recompressed: {original_size / 1024:.1f} KB -> "
+                             f"{len(cover_data) / 1024:.1f} KB")
+            else:
+                notes.append(f"Cover left unchanged ({original_size / 1024:.1f} KB): "
+                             "no smaller lossless encoding found")
+        book.set_cover(f"cover{ext}", cover_data)
 
     # CSS
     css_item = epub.EpubItem(
@@ -84,11 +135,42 @@ def build_epub(output_path: str | Path = DEFAULT_OUTPUT,
     )
     book.add_item(css_item)
 
+    # Copyright Page
+    c_copyright = epub.EpubHtml(title='Copyright', file_name='copyright.xhtml', lang='en')
+    c_copyright.content = copyright_html
+    c_copyright.add_item(css_item)
+    book.add_item(c_copyright)
+
     chapters_list = []
+
+    def add_book_file(book_name: str, filename: str,
+                      content: str | None = None, source: Path | None = None):
+        c = book_class(
+            title=book_name,
+            file_name=filename,
+            lang="en"
+        )
+        if low_memory:
+            if source is None:
+                source = Path(spool_dir.name) / filename
+                source.write_text(content, encoding="utf-8")
+            c.spool_path = source
+        else:
+            c.content = content if content is not None else source.read_text(encoding="utf-8")
+        c.add_item(css_item)
+
+        book.add_item(c)
+        chapters_list.append(c)
     
+    # Per-book lookups for the whole selection, done once up front
+    filenames = [canon.filename(name) for name, _ in books_to_build]
+    book_chapters = [canon.chapters_for(name, total, chapter_selection)
+                     for name, total in books_to_build]
+
     # 3. Main Loop
     total_books = len(books_to_build)
     for i, (book_name, total) in enumerate(books_to_build):
+        chapters = book_chapters[i]
 
         if progress_callback:
             # Report progress for compiling this book
@@ -97,9 +179,8 @@ def build_epub(output_path: str | Path = DEFAULT_OUTPUT,
         # --- Cross-Book Linking Logic ---
         # Previous Book Info
         if i > 0:
-            prev_book_name, prev_book_total = books_to_build[i-1]
-            prev_file = make_filename(prev_book_name)
-            prev_book_link = f"{prev_file}#ch{prev_book_total}"
+            prev_book_name, _ = books_to_build[i-1]
+            prev_book_link = f"{filenames[i-1]}#ch{book_chapters[i-1][-1]}"
             prev_book_label = f"&laquo; {prev_book_name}"
         else:
             prev_book_link = "copyright.xhtml" # Start goes back to copyright
@@ -108,20 +189,25 @@ def build_epub(output_path: str | Path = DEFAULT_OUTPUT,
         # Next Book Info
         if i < len(books_to_build) - 1:
             next_book_name, _ = books_to_build[i+1]
-            next_file = make_filename(next_book_name)
-            next_book_link = f"{next_file}#ch1"
+            next_book_link = f"{filenames[i+1]}#ch{book_chapters[i+1][0]}"
             next_book_label = f"{next_book_name} &raquo;"
         else:
             next_book_link = "#"
             next_book_label = ""
 
+        # Books rendered by an interrupted run are taken from the journal
+        filename = filenames[i]
+        if journal.book_done(book_name, filename):
+            add_book_file(book_name, filename, source=journal.rendered_path(filename))
+            continue
+
         # --- Start Building HTML ---
-        filename = make_filename(book_name)
         book_html = []
+        complete = True
         
         # A. Book Title Page
         # We add id="top" here so the 'Chapters' button knows where to jump
-        book_html.append(f'<h1 id="top" style="font-size: 2.5em; margin-top: 15%;">{book_name}</h1>')
+        book_html.append(f'<h1 id="top" class="book-title">{book_name}</h1>')
         
         # --- NEW: Intro Disclaimer ---
         disclaimer = """
@@ -134,34 +220,40 @@ def build_epub(output_path: str | Path = DEFAULT_OUTPUT,
         book_html.append(disclaimer)
 
         # B. Chapter Grid
-        book_html.append('<div class="chapter-grid">')
-        for c in range(1, total + 1):
-            book_html.append(f'<a class="grid-link" href="#ch{c}">{c}</a>')
-        book_html.append('</div>')
+        book_html.append(chapter_grid(chapters))
         
         # Page break after the title/grid page
         book_html.append('<div class="break-before"></div>')
 
         # C. Chapters
-        for ch in range(1, total + 1):
-            text = fetch_results.get((book_name, ch))
+        for pos, ch in enumerate(chapters):
+            # Chapters skipped by a resumed fetch are read back from the cache
+            text = fetch_results.get((book_name, ch)) or read_cached_chapter(book_name, ch)
             if not text:
+                # Fetch failures were logged by the fetcher; anything else
+                # (e.g. a cache file deleted after it was journaled) is new
+                if not journal.chapter_failed(book_name, ch):
+                    log_error(f"{book_name} {ch}: missing from cache")
+                journal.mark_chapter(book_name, ch, ok=False)
+                complete = False
                 continue
 
-            if ch > 1:
+            if pos > 0:
                 book_html.append('<div class="break-before"></div>')
 
             # --- Calculate Local Prev/Next Links ---
-            if ch > 1:
-                prev_link = f"#ch{ch-1}"
-                prev_text = f"&laquo; Ch {ch-1}"
+            if pos > 0:
+                prev_ch = chapters[pos-1]
+                prev_link = f"#ch{prev_ch}"
+                prev_text = f"&laquo; Ch {prev_ch}"
             else:
                 prev_link = prev_book_link
                 prev_text = prev_book_label
 
-            if ch < total:
-                next_link = f"#ch{ch+1}"
-                next_text = f"Ch {ch+1} &raquo;"
+            if pos < len(chapters) - 1:
+                next_ch = chapters[pos+1]
+                next_link = f"#ch{next_ch}"
+                next_text = f"Ch {next_ch} &raquo;"
             else:
                 next_link = next_book_link
                 next_text = next_book_label
@@ -185,16 +277,16 @@ def build_epub(output_path: str | Path = DEFAULT_OUTPUT,
             book_html.append('</div>')
 
         # 4. Create the File
-        c = epub.EpubHtml(
-            title=book_name,
-            file_name=filename,
-            lang="en"
-        )
-        c.content = "".join(book_html)
-        c.add_item(css_item)
+        content = "".join(book_html)
+        if optimize_size:
+            content = minify_xhtml(content)
 
-        book.add_item(c)
-        chapters_list.append(c)
+        # Books with missing chapters are re-rendered once those are retried
+        if complete:
+            journal.mark_book(book_name, filename, content)
+            add_book_file(book_name, filename, content, source=journal.rendered_path(filename))
+        else:
+            add_book_file(book_name, filename, content)
 
     # 5. Finalize Spine & TOC
     # Add copyright as the FIRST item
@@ -206,4 +298,15 @@ def build_epub(output_path: str | Path = DEFAULT_OUTPUT,
     book.add_item(epub.EpubNcx())
     book.add_item(epub.EpubNav())
 
-    epub.write_epub(output_path, book, {})
+    epub.write_epub(output_path, book, write_options)
+    if spool_dir:
+        spool_dir.cleanup()
+
+    # A finished build has nothing left to resume, unless chapters still
+    # failed - then keep the journal so the next run retries only those
+    if journal.failed_chapters():
+        journal.save()
+    else:
+        journal.clear()
+
+    return notes
@@ -0,0 +1,231 @@
+# ---------------------------------------------------------------------------
+# NET Bible (2nd Ed) Builder
+# Copyright (C) 2026 The net-bible-builder Authors
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# ---------------------------------------------------------------------------
+
+"""
+Book metadata computed once from BOOKS_DATA at import time.
+
+Books are identified by their index in BOOKS_DATA; per-book facts live in
+parallel arrays so lookups during a build are plain indexing.
+"""
+
+import re
+from array import array
+
+from .config import BOOKS_DATA, NEW_TESTAMENT_BOOKS
+
+# Common abbreviations accepted by --books (matched case-insensitively,
+# ignoring spaces and periods). Full names always work too.
+ABBREVIATIONS = {
+    "Genesis": ("gen", "ge", "gn"),
+    "Exodus": ("exod", "exo", "ex"),
+    "Leviticus": ("lev", "le", "lv"),
+    "Numbers": ("num", "nu", "nm"),
+    "Deuteronomy": ("deut", "deu", "dt"),
+    "Joshua": ("josh", "jos"),
+    "Judges": ("judg", "jdg"),
+    "Ruth": ("ru", "rth"),
+    "1 Samuel": ("1sam", "1sa"),
+    "2 Samuel": ("2sam", "2sa"),
+    "1 Kings": ("1kgs", "1ki"),
+    "2 Kings": ("2kgs", "2ki"),
+    "1 Chronicles": ("1chr", "1ch"),
+    "2 Chronicles": ("2chr", "2ch"),
+    "Ezra": ("ezr",),
+    "Nehemiah": ("neh", "ne"),
+    "Esther": ("esth", "est"),
+    "Job": ("jb",),
+    "Psalms": ("ps", "psa", "psalm", "pss"),
+    "Proverbs": ("prov", "pro", "prv"),
+    "Ecclesiastes": ("eccl", "ecc", "qoh"),
+    "Song of Solomon": ("song", "sos", "songofsongs", "cant"),
+    "Isaiah": ("isa", "is"),
+    "Jeremiah": ("jer", "je"),
+    "Lamentations": ("lam", "la"),
+    "Ezekiel": ("ezek", "eze", "ezk"),
+    "Daniel": ("dan", "da", "dn"),
+    "Hosea": ("hos", "ho"),
+    "Joel": ("jl",),
+    "Amos": ("am",),
+    "Obadiah": ("obad", "ob"),
+    "Jonah": ("jon", "jnh"),
+    "Micah": ("mic", "mi"),
+    "Nahum": ("nah", "na"),
+    "Habakkuk": ("hab", "hb"),
+    "Zephaniah": ("zeph", "zep"),
+    "Haggai": ("hag", "hg"),
+    "Zechariah": ("zech", "zec"),
+    "Malachi": ("mal", "ml"),
+    "Matthew": ("matt", "mat", "mt"),
+    "Mark": ("mk", "mrk"),
+    "Luke": ("lk", "luk"),
+    "John": ("jn", "jhn"),
+    "Acts": ("ac", "act"),
+    "Romans": ("rom", "ro", "rm"),
+    "1 Corinthians": ("1cor", "1co"),
+    "2 Corinthians": ("2cor", "2co"),
+    "Galatians": ("gal", "ga"),
+    "Ephesians": ("eph", "ephes"),
+    "Philippians": ("phil", "php"),
+    "Colossians": ("col",),
+    "1 Thessalonians": ("1thess", "1th"),
+    "2 Thessalonians": ("2thess", "2th"),
+    "1 Timothy": ("1tim", "1ti"),
+    "2 Timothy": ("2tim", "2ti"),
+    "Titus": ("tit",),
+    "Philemon": ("phlm", "phm", "philem"),
+    "Hebrews": ("heb",),
+    "James": ("jas", "jm"),
+    "1 Peter": ("1pet", "1pe", "1pt"),
+    "2 Peter": ("2pet", "2pe", "2pt"),
+    "1 John": ("1jn", "1jhn"),
+    "2 John": ("2jn", "2jhn"),
+    "3 John": ("3jn", "3jhn"),
+    "Jude": ("jud", "jd"),
+    "Revelation": ("rev", "re", "rv"),
+}
+
+
+def normalize(name: str) -> str:
+    """Lookup key for a book name or abbreviation: "1 Sam." -> "1sam"."""
+    return re.sub(r"[\s.]+", "", name).lower()
+
+
+def make_slug(book: str) -> str:
+    # Example: "1 John" -> "1_john"
+    return book.replace(" ", "_").lower()
+
+
+# --- The table ---
+BOOK_NAMES: list[str] = [name for name, _ in BOOKS_DATA]
+CHAPTER_COUNTS = array("H", (total for _, total in BOOKS_DATA))
+# CHAPTER_OFFSETS[i] is the number of chapters before book i; the extra
+# last entry is the total chapter count
+CHAPTER_OFFSETS = array("I", [0])
+for _total in CHAPTER_COUNTS:
+    CHAPTER_OFFSETS.append(CHAPTER_OFFSETS[-1] + _total)
+IS_NEW_TESTAMENT = array("B", (name in NEW_TESTAMENT_BOOKS for name in BOOK_NAMES))
+SLUGS: list[str] = [make_slug(name) for name in BOOK_NAMES]
+FILENAMES: list[str] = [f"{slug}.xhtml" for slug in SLUGS]
+
+_LOOKUP: dict[str, int] = {}
+for _id, _name in enumerate(BOOK_NAMES):
+    for _key in (_name, SLUGS[_id], *ABBREVIATIONS.get(_name, ())):
+        _LOOKUP.setdefault(normalize(_key), _id)
+
+_ID_OF: dict[str, int] = {name: i for i, name in enumerate(BOOK_NAMES)}
+_SLUG_OF: dict[str, str] = dict(zip(BOOK_NAMES, SLUGS))
+_FILENAME_OF: dict[str, str] = dict(zip(BOOK_NAMES, FILENAMES))
+
+
+def book_id(name: str) -> int:
+    """Index of a book by name, slug or abbreviation. Raises KeyError if unknown."""
+    return _LOOKUP[normalize(name)]
+
+
+def slug(book: str) -> str:
+    """Slug used for cache and EPUB file names."""
+    return _SLUG_OF.get(book) or make_slug(book)
+
+
+def filename(book: str) -> str:
+    return _FILENAME_OF.get(book) or f"{make_slug(book)}.xhtml"
+
+
+def chapter_index(book: str, chapter: int) -> int:
+    """Position of a chapter in the whole canon, counting from 0."""
+    bid = _ID_OF.get(book)
+    if bid is None:
+        bid = book_id(book)
+    return CHAPTER_OFFSETS[bid] + chapter - 1
+
+
+def entry(bid: int) -> tuple[str, int]:
+    """The (name, chapters) pair for a book, as used in books_to_build."""
+    return BOOK_NAMES[bid], CHAPTER_COUNTS[bid]
+
+
+def chapters_for(book: str, total: int,
+                 chapter_selection: dict[str, list[int]] | None = None):
+    """Chapters of a book to build: all of them unless the selection limits it."""
+    if chapter_selection and book in chapter_selection:
+        return tuple(chapter_selection[book])
+    return range(1, total + 1)
+
+
+def testament_books(new_testament: bool) -> list[tuple[str, int]]:
+    return [entry(i) for i, nt in enumerate(IS_NEW_TESTAMENT) if nt == new_testament]
+
+
+# "Matt 5-7", "1 John 2", "Psalms" - the book part is non-greedy so
+# leading digits in names like "1 John" stay with the name
+_TERM_RE = re.compile(r"^(?P<book>.+?)(?:\s+(?P<first>\d+)(?:\s*-\s*(?P<last>\d+))?)?$")
+
+
+def parse_selection(spec: str):
+    """
+    Parses a --books spec such as "Gen-Deut,Matt 5-7,John".
+
+    Returns (books, chapters, unknown):
+      books    - list of (name, total) in requested order, without repeats
+      chapters - dict of book name -> sorted chapter list, only for books
+                 limited to some chapters
+      unknown  - terms that could not be understood
+    """
+    selected: dict[int, set[int] | None] = {}
+    unknown = []
+
+    def add(bid: int, chs: set[int] | None):
+        if bid in selected and (selected[bid] is None or chs is None):
+            selected[bid] = None  # whole book wins
+        elif bid in selected:
+            selected[bid] |= chs
+        else:
+            selected[bid] = chs
+
+    for term in spec.split(","):
+        term = term.strip()
+        if not term:
+            continue
+
+        match = _TERM_RE.match(term)
+        book, first, last = match.group("book", "first", "last")
+        try:
+            if first is None and "-" in book:
+                # Book range, e.g. "Gen-Deut"
+                start, end = (book_id(part) for part in book.split("-", 1))
+                if start > end:
+                    raise KeyError(term)
+                for bid in range(start, end + 1):
+                    add(bid, None)
+                continue
+
+            bid = book_id(book)
+        except (KeyError, ValueError):
+            unknown.append(term)
+            continue
+
+        if first is None:
+            add(bid, None)
+            continue
+
+        first = int(first)
+        last = int(last) if last else first
+        total = CHAPTER_COUNTS[bid]
+        if not 1 <= first <= last <= total:
+            unknown.append(term)
+            continue
+        if first == 1 and last == total:
+            add(bid, None)
+        else:
+            add(bid, set(range(first, last + 1)))
+
+    books = [entry(bid) for bid in selected]
+    chapters = {BOOK_NAMES[bid]: sorted(chs) for bid, chs in selected.items() if chs is not None}
+    return books, chapters, unknown
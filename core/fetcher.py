@@ -10,11 +10,14 @@
 
 import time
 import threading
+from collections.abc import Callable
 from concurrent.futures import ThreadPoolExecutor
 
 import requests
 
+from . import canon
 from .config import API_URL, USER_AGENT, BOOKS_DATA
+from .journal import BuildJournal
 from .utils import chapter_cache_path, log_error
 
 
@@ -64,16 +67,33 @@ def fetch_single_chapter(book: str, chapter: int,
     return None
 
 
+def fetch_chapter_to_cache(book: str, chapter: int,
+                           skip_cache: bool,
+                           retries: int,
+                           limiter: RateLimiter | None) -> bool:
+    """Makes sure a chapter is cached without holding on to its text."""
+    if not skip_cache and chapter_cache_path(book, chapter).exists():
+        return True
+    return fetch_single_chapter(book, chapter, skip_cache, retries, limiter) is not None
+
+
 def fetch_all_chapters(skip_cache: bool = False,
                        retries: int = 3,
                        max_workers: int = 8,
                        max_rps: float = 2.0,
                        resume: bool = True,
-                       progress_callback: callable | None = None,
-                       books_to_fetch: list[tuple[str, int]] | None = None):
+                       progress_callback: Callable | None = None,
+                       books_to_fetch: list[tuple[str, int]] | None = None,
+                       chapter_selection: dict[str, list[int]] | None = None,
+                       journal: BuildJournal | None = None,
+                       keep_text: bool = True):
     """
     Returns dict[(book, chapter)] = text or None.
-    If resume=True, we still fetch everything, but cached chapters are reused.
+    If resume=True and a journal is given, chapters it already records as
+    fetched are skipped entirely (their text stays in the cache), so only
+    missing and previously failed chapters are attempted.
+    With keep_text=False chapters are only written to the cache and the
+    dict stays empty; read them back with read_cached_chapter.
     """
     limiter = RateLimiter(max_rps) if max_rps > 0 else None
 
@@ -83,12 +103,15 @@ def fetch_all_chapters(skip_cache: bool = False,
 
     tasks = []
     results = {}
+    worker = fetch_single_chapter if keep_text else fetch_chapter_to_cache
 
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         for book_name, total_chapters in books_to_fetch:
-            for ch in range(1, total_chapters + 1):
+            for ch in canon.chapters_for(book_name, total_chapters, chapter_selection):
+                if resume and journal and journal.chapter_done(book_name, ch):
+                    continue
                 future = executor.submit(
-                    fetch_single_chapter,
+                    worker,
                     book_name, ch, skip_cache, retries, limiter
                 )
                 tasks.append((future, book_name, ch))
@@ -97,10 +120,16 @@ def fetch_all_chapters(skip_cache: bool = False,
         for i, (future, book_name, ch) in enumerate(tasks):
             try:
                 text = future.result()
-                results[(book_name, ch)] = text
+                if keep_text:
+                    results[(book_name, ch)] = text
             except Exception as e:
+                text = None
                 log_error(f"Failed to fetch {book_name} {ch}: {e}")
+            if journal:
+                journal.mark_chapter(book_name, ch, ok=bool(text))
             if progress_callback:
                 progress_callback("Fetching", i + 1, total_tasks)
 
+    if journal:
+        journal.save()
     return results
@@ -0,0 +1,172 @@
+# ---------------------------------------------------------------------------
+# NET Bible (2nd Ed) Builder
+# Copyright (C) 2026 The net-bible-builder Authors
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# ---------------------------------------------------------------------------
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+from . import canon
+from .config import CACHE_DIR
+from .utils import log_error
+
+JOURNAL_PATH = CACHE_DIR / "build_journal.json"
+RENDER_DIR = CACHE_DIR / "rendered"
+
+# Chapters are marked one at a time; only hit the disk every N marks
+SAVE_EVERY = 50
+
+
+def selection_signature(books: list[tuple[str, int]],
+                        chapter_selection: dict[str, list[int]] | None = None,
+                        optimize_size: bool = False) -> str:
+    """Identifies a book selection so a journal is only reused for the same build."""
+    raw = ";".join(f"{name}:{total}" for name, total in books)
+    if chapter_selection:
+        raw += "|" + ";".join(f"{name}:{chs}" for name, chs in sorted(chapter_selection.items()))
+    if optimize_size:
+        # Rendered books are stored minified in the size profile
+        raw += "|optimize-size"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class BuildJournal:
+    """
+    Records which build steps have completed so an interrupted build can
+    restart at the first incomplete one:
+      * chapters fetched successfully (and those that failed),
+      * books rendered to XHTML (kept in RENDER_DIR),
+      * whole stages - currently "fetch", set once every chapter is in
+        the cache so a resumed build skips fetching altogether.
+    """
+    def __init__(self, signature: str, path: Path = JOURNAL_PATH):
+        self.signature = signature
+        self.path = Path(path)
+        # One flag per chapter of the canon, indexed by canon.chapter_index
+        self.chapters = bytearray(canon.CHAPTER_OFFSETS[-1])
+        self.failed: set[int] = set()
+        self.books: set[str] = set()
+        self.stages: set[str] = set()
+        self._unsaved = 0
+
+    @classmethod
+    def load(cls, books: list[tuple[str, int]],
+             chapter_selection: dict[str, list[int]] | None = None,
+             resume: bool = True,
+             optimize_size: bool = False,
+             path: Path = JOURNAL_PATH) -> "BuildJournal":
+        """
+        Returns the journal for this book selection. A fresh journal is
+        started when resume is off, none exists, or it belongs to another
+        selection.
+        """
+        journal = cls(selection_signature(books, chapter_selection, optimize_size), path)
+        if not resume or not journal.path.exists():
+            journal.clear()
+            return journal
+
+        try:
+            data = json.loads(journal.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            log_error(f"Ignoring unreadable build journal: {e}")
+            journal.clear()
+            return journal
+
+        if data.get("signature") != journal.signature:
+            journal.clear()
+            return journal
+
+        try:
+            for index in data.get("chapters", []):
+                journal.chapters[index] = 1
+            journal.failed = set(data.get("failed", []))
+        except (TypeError, IndexError):
+            # Written for a different BOOKS_DATA or journal layout
+            journal.clear()
+            return journal
+        journal.books = set(data.get("books", []))
+        journal.stages = set(data.get("stages", []))
+        return journal
+
+    # --- Chapters ---
+    def chapter_done(self, book: str, chapter: int) -> bool:
+        return bool(self.chapters[canon.chapter_index(book, chapter)])
+
+    def chapter_failed(self, book: str, chapter: int) -> bool:
+        return canon.chapter_index(book, chapter) in self.failed
+
+    def mark_chapter(self, book: str, chapter: int, ok: bool):
+        index = canon.chapter_index(book, chapter)
+        if ok:
+            self.chapters[index] = 1
+            self.failed.discard(index)
+        else:
+            # Forget any earlier success so the next run fetches it again
+            self.chapters[index] = 0
+            self.failed.add(index)
+            self.stages.discard("fetch")
+
+        self._unsaved += 1
+        if self._unsaved >= SAVE_EVERY:
+            self.save()
+
+    def failed_chapters(self) -> list[int]:
+        """Canon positions (see canon.chapter_index) of chapters that failed."""
+        return sorted(self.failed)
+
+    # --- Books ---
+    def rendered_path(self, filename: str) -> Path:
+        return RENDER_DIR / filename
+
+    def book_done(self, book: str, filename: str) -> bool:
+        return book in self.books and self.rendered_path(filename).exists()
+
+    def mark_book(self, book: str, filename: str, content: str):
+        RENDER_DIR.mkdir(parents=True, exist_ok=True)
+        self.rendered_path(filename).write_text(content, encoding="utf-8")
+        self.books.add(book)
+        self.save()
+
+    # --- Stages ---
+    def stage_done(self, stage: str) -> bool:
+        return stage in self.stages
+
+    def mark_stage(self, stage: str):
+        self.stages.add(stage)
+        self.save()
+
+    # --- Persistence ---
+    def save(self):
+        data = {
+            "signature": self.signature,
+            "chapters": [i for i, done in enumerate(self.chapters) if done],
+            "failed": sorted(self.failed),
+            "books": sorted(self.books),
+            "stages": sorted(self.stages),
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file first so an interrupt never leaves half a journal
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            tmp.replace(self.path)
+            self._unsaved = 0
+        except OSError as e:
+            log_error(f"Failed to save build journal: {e}")
+
+    def clear(self):
+        """Forgets all progress, removing the journal and rendered books."""
+        self.chapters = bytearray(len(self.chapters))
+        self.failed.clear()
+        self.books.clear()
+        self.stages.clear()
+        self._unsaved = 0
+        self.path.unlink(missing_ok=True)
+        shutil.rmtree(RENDER_DIR, ignore_errors=True)
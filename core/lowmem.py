@@ -0,0 +1,54 @@
+# ---------------------------------------------------------------------------
+# NET Bible (2nd Ed) Builder
+# Copyright (C) 2026 The net-bible-builder Authors
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# ---------------------------------------------------------------------------
+
+import sys
+from pathlib import Path
+
+from ebooklib import epub
+
+# resource is POSIX-only; peak memory is simply not reported elsewhere
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class SpooledContentMixin:
+    """
+    Keeps an EpubHtml's content in a file on disk. ebooklib only reads
+    `content` while writing that one document into the archive, so each
+    book is loaded just long enough to be serialized and then freed.
+    """
+    spool_path: Path | None = None
+
+    @property
+    def content(self):
+        if self.spool_path is not None:
+            return self.spool_path.read_text(encoding="utf-8")
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+
+
+class SpooledEpubHtml(SpooledContentMixin, epub.EpubHtml):
+    pass
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident memory of this process in MB, or None if unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
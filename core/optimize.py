@@ -0,0 +1,188 @@
+# ---------------------------------------------------------------------------
+# NET Bible (2nd Ed) Builder
+# Copyright (C) 2026 The net-bible-builder Authors
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# ---------------------------------------------------------------------------
+
+import io
+import re
+import struct
+import zipfile
+import zlib
+from pathlib import Path
+
+# Pillow is listed in requirements.txt; without it covers only get a
+# lossless re-deflate
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Deflate level for the EPUB archive in the size-optimized profile
+ZIP_COMPRESSLEVEL = 9
+
+# Covers larger than this (the common e-reader recommendation) are scaled down
+COVER_MAX_SIZE = (1600, 2560)
+
+# PNG chunks that only carry metadata and never change how the image looks
+PNG_DROP_CHUNKS = {b"tIME", b"tEXt", b"zTXt", b"iTXt", b"pHYs"}
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Whitespace around these tags never renders, so it can go entirely
+BLOCK_TAGS = (
+    "html|head|body|title|meta|link|div|p|h[1-6]|ul|ol|li|nav|section|table|tr|td|th|br"
+)
+_BLOCK_SPACE_RE = re.compile(rf"\s*(</?(?:{BLOCK_TAGS})\b[^>]*>)\s*")
+# Lone spaces are left alone: matching every gap between words makes re.sub
+# build a fragment per word, tens of MB for a book like Psalms
+_SPACE_RE = re.compile(r"\s{2,}|[^\S ]")
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(kind + data) & 0xFFFFFFFF
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", crc)
+
+
+def recompress_png(data: bytes) -> bytes:
+    """
+    Losslessly shrinks a PNG: drops metadata-only chunks and merges the
+    pixel data into a single IDAT chunk, re-deflating it at maximum
+    compression unless it already is. Returns the original bytes if the
+    result isn't smaller or the data doesn't parse as a PNG.
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return data
+
+    chunks = []
+    idat = []
+    pos = len(PNG_SIGNATURE)
+    try:
+        while pos < len(data):
+            length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+            body = data[pos + 8:pos + 8 + length]
+            pos += 12 + length
+            if kind == b"IDAT":
+                if not idat:
+                    chunks.append((b"IDAT", None))  # placeholder keeps chunk order
+                idat.append(body)
+            elif kind not in PNG_DROP_CHUNKS:
+                chunks.append((kind, body))
+        packed = b"".join(idat)
+        # FLEVEL in the zlib header: 3 means it was already deflated at the
+        # maximum level, so re-deflating costs seconds and gains nothing
+        if len(packed) < 2 or packed[1] >> 6 != 3:
+            packed = zlib.compress(zlib.decompress(packed), 9)
+    except (struct.error, zlib.error):
+        return data
+
+    out = [PNG_SIGNATURE]
+    for kind, body in chunks:
+        out.append(_png_chunk(kind, packed if body is None else body))
+    result = b"".join(out)
+    return result if len(result) < len(data) else data
+
+
+def _pillow_optimize(data: bytes, ext: str) -> bytes:
+    img = Image.open(io.BytesIO(data))
+    changed = False
+
+    # An alpha channel that is fully opaque carries no information
+    if img.mode == "RGBA" and img.getchannel("A").getextrema() == (255, 255):
+        img = img.convert("RGB")
+        changed = True
+
+    if img.width > COVER_MAX_SIZE[0] or img.height > COVER_MAX_SIZE[1]:
+        img.thumbnail(COVER_MAX_SIZE, Image.LANCZOS)
+        changed = True
+
+    if ext == ".png":
+        out = io.BytesIO()
+        img.save(out, "PNG", optimize=True)
+        return out.getvalue()
+    if changed and ext in (".jpg", ".jpeg"):
+        # Only re-encode lossy formats when the image really changed
+        out = io.BytesIO()
+        img.save(out, "JPEG", quality=90, optimize=True)
+        return out.getvalue()
+    return data
+
+
+def optimize_image(data: bytes, ext: str) -> bytes:
+    """
+    Shrinks an image without visible change: opaque alpha is dropped,
+    oversized images are scaled to COVER_MAX_SIZE and PNGs are recompressed.
+    Returns the original bytes whenever that is smaller.
+    """
+    if Image is not None:
+        try:
+            optimized = _pillow_optimize(data, ext)
+        except OSError:
+            optimized = data
+    elif ext == ".png":
+        optimized = recompress_png(data)
+    else:
+        optimized = data
+    return optimized if len(optimized) < len(data) else data
+
+
+def _minify_declarations(match: re.Match) -> str:
+    return re.sub(r"\s*([:;])\s*", r"\1", match.group(0))
+
+
+def minify_css(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = _SPACE_RE.sub(" ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    # Whitespace before ":" is significant in selectors ("a :hover"), so
+    # only tighten colons inside declaration blocks
+    css = re.sub(r"\{[^{}]*\}", _minify_declarations, css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+def minify_xhtml(html: str) -> str:
+    """
+    Collapses whitespace runs to one space (equivalent in rendered HTML,
+    as we never emit <pre>) and removes it around block-level tags.
+    """
+    html = _SPACE_RE.sub(" ", html)
+    html = _BLOCK_SPACE_RE.sub(r"\1", html)
+    return html.strip()
+
+
+def component_of(name: str) -> str:
+    ext = Path(name).suffix.lower()
+    if ext in (".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp"):
+        return "images"
+    if ext == ".css":
+        return "css"
+    if ext in (".xhtml", ".html"):
+        return "nav" if Path(name).stem == "nav" else "text"
+    return "package"  # mimetype, container.xml, OPF, NCX
+
+
+def size_report(epub_path: str | Path) -> dict[str, tuple[int, int]]:
+    """
+    Returns {component: (uncompressed bytes, compressed bytes)} for a
+    finished EPUB, plus a "total" entry with the archive size on disk.
+    """
+    report = {}
+    with zipfile.ZipFile(epub_path) as zf:
+        for info in zf.infolist():
+            key = component_of(info.filename)
+            raw, packed = report.get(key, (0, 0))
+            report[key] = (raw + info.file_size, packed + info.compress_size)
+    raw_total = sum(raw for raw, _ in report.values())
+    report["total"] = (raw_total, Path(epub_path).stat().st_size)
+    return report
+
+
+def format_size_report(report: dict[str, tuple[int, int]]) -> list[str]:
+    lines = [f"{'Component':<10} {'Raw KB':>10} {'Zipped KB':>10}"]
+    for key, (raw, packed) in report.items():
+        lines.append(f"{key:<10} {raw / 1024:>10.1f} {packed / 1024:>10.1f}")
+    return lines
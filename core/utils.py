@@ -8,7 +8,9 @@
 # (at your option) any later version.
 # ---------------------------------------------------------------------------
 
+from functools import cache
 from pathlib import Path
+from . import canon
 from .config import CACHE_DIR, ERROR_LOG_PATH
 
 def log_error(msg: str):
@@ -19,8 +21,19 @@ def log_error(msg: str):
     except Exception as e:
         print(f"Failed to write to log file: {e}")
 
+@cache
+def cache_dir() -> Path:
+    """The chapter cache directory, created on first use."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    return CACHE_DIR
+
 def chapter_cache_path(book: str, chapter: int) -> Path:
     """Generates the cache path for a given book and chapter."""
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    safe_book_name = book.replace(" ", "_").lower()
-    return CACHE_DIR / f"{safe_book_name}_{chapter}.html"
\ No newline at end of file
+    return cache_dir() / f"{canon.slug(book)}_{chapter}.html"
+
+def read_cached_chapter(book: str, chapter: int) -> str | None:
+    """Returns the cached text for a chapter, or None if it was never fetched."""
+    cache_path = chapter_cache_path(book, chapter)
+    if not cache_path.exists():
+        return None
+    return cache_path.read_text(encoding="utf-8")
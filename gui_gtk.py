@@ -9,15 +9,118 @@
 # ---------------------------------------------------------------------------
 
 import threading
+import time
+from collections import deque
+from collections.abc import Callable
 from pathlib import Path
 
 import gi
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk, GLib  # type: ignore
 
+from core import canon
 from core.builder import build_epub
+from core.optimize import format_size_report, size_report
 from core.validate import validate_epub
-from core.config import DEFAULT_OUTPUT, BOOKS_DATA, OLD_TESTAMENT_BOOKS, NEW_TESTAMENT_BOOKS
+from core.config import DEFAULT_OUTPUT
+
+# --- Main loop pacing ---
+PROGRESS_FPS = 15        # Max progress redraws per second
+LOG_FLUSH_MS = 100       # How often queued log lines are written to the view
+MAX_LOG_LINES = 2000     # Scrollback kept in the log view
+
+
+def format_eta(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+class ProgressChannel:
+    """
+    Coalesces progress updates coming from worker threads.
+    Only the latest state is kept, and it is handed to `deliver` on the
+    GTK main loop at most PROGRESS_FPS times per second, together with the
+    stage throughput (items/s) and ETA in seconds (None until known).
+    """
+    def __init__(self, deliver: Callable, fps: int = PROGRESS_FPS):
+        self.deliver = deliver
+        self.interval_ms = max(1, int(1000 / fps))
+        self.lock = threading.Lock()
+        self.latest = None
+        self.scheduled = False
+        self.stage_starts = {}
+
+    def reset(self):
+        with self.lock:
+            self.latest = None
+            self.stage_starts.clear()
+
+    def push(self, stage: str, current: int, total: int):
+        now = time.monotonic()
+        with self.lock:
+            start_time, start_count = self.stage_starts.setdefault(stage, (now, current))
+            elapsed = now - start_time
+            done = current - start_count
+            rate = done / elapsed if elapsed > 0 and done > 0 else 0.0
+            eta = (total - current) / rate if rate > 0 else None
+
+            self.latest = (stage, current, total, rate, eta)
+            if self.scheduled:
+                return
+            self.scheduled = True
+        GLib.timeout_add(self.interval_ms, self._flush)
+
+    def _flush(self):
+        with self.lock:
+            latest = self.latest
+            self.latest = None
+            self.scheduled = False
+        if latest is not None:
+            self.deliver(*latest)
+        return False  # one-shot timeout
+
+
+class LogQueue:
+    """
+    Batches log lines from any thread and writes them to a TextBuffer
+    in one insert per flush, trimming the buffer to MAX_LOG_LINES.
+    """
+    def __init__(self, buffer: Gtk.TextBuffer, max_lines: int = MAX_LOG_LINES):
+        self.buffer = buffer
+        self.max_lines = max_lines
+        self.lock = threading.Lock()
+        # Lines beyond the scrollback would be trimmed anyway, so cap the queue too
+        self.pending = deque(maxlen=max_lines)
+        self.scheduled = False
+
+    def append(self, text: str):
+        with self.lock:
+            self.pending.append(text)
+            if self.scheduled:
+                return
+            self.scheduled = True
+        GLib.timeout_add(LOG_FLUSH_MS, self._flush)
+
+    def _flush(self):
+        with self.lock:
+            lines = list(self.pending)
+            self.pending.clear()
+            self.scheduled = False
+        if not lines:
+            return False
+
+        self.buffer.insert(self.buffer.get_end_iter(), "\n".join(lines) + "\n")
+
+        # Drop the oldest lines once we exceed the scrollback (the final
+        # newline leaves an empty last line, hence the +1)
+        excess = self.buffer.get_line_count() - 1 - self.max_lines
+        if excess > 0:
+            start = self.buffer.get_start_iter()
+            cut = self.buffer.get_iter_at_line(excess)
+            self.buffer.delete(start, cut)
+        return False
 
 
 class BuilderWindow(Gtk.Window):
@@ -48,6 +151,9 @@ class BuilderWindow(Gtk.Window):
         self.validate_check = Gtk.CheckButton(label="Validate EPUB after build")
         vbox.pack_start(self.validate_check, False, False, 0)
 
+        self.optimize_check = Gtk.CheckButton(label="Optimize for size")
+        vbox.pack_start(self.optimize_check, False, False, 0)
+
         # Max workers
         h_workers = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
         vbox.pack_start(h_workers, False, False, 0)
@@ -84,6 +190,8 @@ class BuilderWindow(Gtk.Window):
         self.log_view = Gtk.TextView()
         self.log_view.set_editable(False)
         self.log_buffer = self.log_view.get_buffer()
+        self.log_queue = LogQueue(self.log_buffer)
+        self.progress_channel = ProgressChannel(self._update_progress)
         scrolled = Gtk.ScrolledWindow()
         scrolled.set_hexpand(True)
         scrolled.set_vexpand(True)
@@ -126,52 +234,55 @@ class BuilderWindow(Gtk.Window):
         scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         vbox.pack_start(scrolled, True, True, 0)
 
-        self.book_checkboxes = {}
+        # Indexed by canon book id
+        self.book_checkboxes = []
         grid = Gtk.Grid(column_spacing=10, row_spacing=5)
         scrolled.add(grid)
-        for i, (book_name, _) in enumerate(BOOKS_DATA):
+        for i, book_name in enumerate(canon.BOOK_NAMES):
             check = Gtk.CheckButton(label=book_name)
             check.set_active(True)
             grid.attach(check, i % 3, i // 3, 1, 1)
-            self.book_checkboxes[book_name] = check
+            self.book_checkboxes.append(check)
 
     def append_log(self, text: str):
-        def _append():
-            end_iter = self.log_buffer.get_end_iter()
-            self.log_buffer.insert(end_iter, text + "\n")
-            return False
-
-        GLib.idle_add(_append)
+        self.log_queue.append(text)
 
     def _reset_progress(self):
         self.progress_label.set_text("")
         self.progress_bar.set_fraction(0)
         self.progress_bar.set_text("")
 
-    def _update_progress(self, stage: str, current: int, total: int):
+    def _update_progress(self, stage: str, current: int, total: int,
+                         rate: float = 0.0, eta: float | None = None):
         fraction = current / total if total > 0 else 0
-        self.progress_label.set_text(stage)
+        label = stage
+        if rate > 0:
+            unit = "ch" if "Fetching" in stage else "books"
+            label += f" — {rate:.1f} {unit}/s"
+        if eta is not None and current < total:
+            label += f", ETA {format_eta(eta)}"
+        self.progress_label.set_text(label)
         self.progress_bar.set_fraction(fraction)
         self.progress_bar.set_text(f"{current} / {total}")
-        return False  # for GLib.idle_add
 
     def on_select_books(self, button, selection_type):
         if selection_type == "all":
-            for checkbox in self.book_checkboxes.values():
+            for checkbox in self.book_checkboxes:
                 checkbox.set_active(True)
         elif selection_type == "none":
-            for checkbox in self.book_checkboxes.values():
+            for checkbox in self.book_checkboxes:
                 checkbox.set_active(False)
         elif selection_type == "ot":
-            for book, checkbox in self.book_checkboxes.items():
-                checkbox.set_active(book in OLD_TESTAMENT_BOOKS)
+            for checkbox, nt in zip(self.book_checkboxes, canon.IS_NEW_TESTAMENT):
+                checkbox.set_active(not nt)
         elif selection_type == "nt":
-            for book, checkbox in self.book_checkboxes.items():
-                checkbox.set_active(book in NEW_TESTAMENT_BOOKS)
+            for checkbox, nt in zip(self.book_checkboxes, canon.IS_NEW_TESTAMENT):
+                checkbox.set_active(bool(nt))
 
     def on_build_clicked(self, button):
         self.build_button.set_sensitive(False)
         self._reset_progress()
+        self.progress_channel.reset()
         self.append_log("Starting build...")
 
         output = self.output_entry.get_text().strip()
@@ -180,36 +291,39 @@ class BuilderWindow(Gtk.Window):
 
         skip_cache = self.skip_cache_check.get_active()
         validate = self.validate_check.get_active()
+        optimize_size = self.optimize_check.get_active()
         max_workers = self.workers_spin.get_value_as_int()
         max_rps = self.rps_spin.get_value()
 
-        books_to_build = []
-        for book_name, total_chapters in BOOKS_DATA:
-            if self.book_checkboxes[book_name].get_active():
-                books_to_build.append((book_name, total_chapters))
+        books_to_build = [canon.entry(i) for i, checkbox in enumerate(self.book_checkboxes)
+                          if checkbox.get_active()]
 
         if not books_to_build:
             self.append_log("Error: No books selected. Please select at least one book to build.")
             self.build_button.set_sensitive(True)
             return
 
-        def progress_handler(stage, current, total):
-            GLib.idle_add(self._update_progress, stage, current, total)
-
         def worker():
             try:
                 self.append_log("Building EPUB...")
-                build_epub(
+                notes = build_epub(
                     output_path=output,
                     skip_cache=skip_cache,
                     retries=3,
                     max_workers=max_workers,
                     max_rps=max_rps,
                     resume=True,
-                    progress_callback=progress_handler,
+                    progress_callback=self.progress_channel.push,
                     books_to_build=books_to_build,
+                    optimize_size=optimize_size,
                 )
                 self.append_log(f"Build complete: {output}")
+                for note in notes:
+                    self.append_log(note)
+
+                if optimize_size:
+                    for line in format_size_report(size_report(output)):
+                        self.append_log(line)
 
                 if validate:
                     self.append_log("Validating EPUB...")
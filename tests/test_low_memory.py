@@ -0,0 +1,109 @@
+# ---------------------------------------------------------------------------
+# NET Bible (2nd Ed) Builder
+# Copyright (C) 2026 The net-bible-builder Authors
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# ---------------------------------------------------------------------------
+
+"""
+Peak-memory regression test for --low-memory.
+
+Runs a full 66-book build offline in a subprocess (ru_maxrss is process
+wide) against a cache seeded with fixture chapters, and checks that the
+CLI's --memory-ceiling check passes. Override the ceiling with the
+NET_BIBLE_MEMORY_CEILING_MB environment variable.
+"""
+
+import ast
+import os
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("ebooklib")
+pytest.importorskip("tqdm")
+pytest.importorskip("resource")
+
+ROOT = Path(__file__).resolve().parent.parent
+CONFIG_SAMPLE = ROOT / "core" / "config.py.sample"
+
+MEMORY_CEILING_MB = float(os.environ.get("NET_BIBLE_MEMORY_CEILING_MB", "75"))
+
+# Roughly a long NET chapter with "para" formatting
+CHAPTER_BYTES = 16 * 1024
+
+# Runs cli.py with a config pointing at the seeded cache and no network
+DRIVER = """
+import runpy, sys, types
+from pathlib import Path
+
+root, cache = Path(sys.argv[1]), Path(sys.argv[2])
+config = types.ModuleType("core.config")
+exec((root / "core" / "config.py.sample").read_text(encoding="utf-8"), config.__dict__)
+config.CACHE_DIR = cache
+config.ERROR_LOG_PATH = cache / "errors.log"
+config.OLD_TESTAMENT_BOOKS = [name for name, _ in config.BOOKS_DATA[:39]]
+config.NEW_TESTAMENT_BOOKS = [name for name, _ in config.BOOKS_DATA[39:]]
+sys.modules["core.config"] = config
+
+def offline_get(*args, **kwargs):
+    raise AssertionError("network access during an offline build")
+sys.modules["requests"] = types.SimpleNamespace(get=offline_get)
+
+sys.path.insert(0, str(root))
+sys.argv = ["cli.py"] + sys.argv[3:]
+runpy.run_path(str(root / "cli.py"), run_name="__main__")
+"""
+
+
+def books_data() -> list[tuple[str, int]]:
+    # Read BOOKS_DATA without importing core (which needs a real config.py)
+    tree = ast.parse(CONFIG_SAMPLE.read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and node.targets[0].id == "BOOKS_DATA":
+            return ast.literal_eval(node.value)
+    raise AssertionError("BOOKS_DATA not found in config.py.sample")
+
+
+@pytest.fixture
+def seeded_cache(tmp_path):
+    cache = tmp_path / "cache"
+    cache.mkdir()
+    verse = "For God so loved the world that he gave his one and only Son. "
+    for book, total in books_data():
+        slug = book.replace(" ", "_").lower()
+        for ch in range(1, total + 1):
+            body = (f"<b>{ch}:1</b> " + verse * (CHAPTER_BYTES // len(verse)))
+            (cache / f"{slug}_{ch}.html").write_text(
+                f'<p class="bodytext">{book} {body}</p>', encoding="utf-8"
+            )
+    return cache
+
+
+def run_build(cache: Path, output: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", DRIVER, str(ROOT), str(cache),
+         "-o", str(output), "--max-rps", "0", *args],
+        cwd=ROOT, capture_output=True, text=True, timeout=600,
+    )
+
+
+@pytest.mark.parametrize("extra_args", [(), ("--optimize-size",)],
+                         ids=["default", "optimize-size"])
+def test_low_memory_full_build_stays_under_ceiling(seeded_cache, tmp_path, extra_args):
+    output = tmp_path / "bible.epub"
+    result = run_build(seeded_cache, output, "--low-memory", *extra_args,
+                       "--memory-ceiling", str(MEMORY_CEILING_MB))
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Peak memory:" in result.stdout
+    with zipfile.ZipFile(output) as zf:
+        books = [n for n in zf.namelist()
+                 if n.endswith(".xhtml") and Path(n).stem not in ("nav", "cover", "copyright")]
+    assert len(books) == 66